@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
+import batch
 import editing
+import jobs
 import os
 # Ollamaライブラリが参照するホスト先を、コンテナ名に変更
 
@@ -16,6 +18,8 @@ app.add_middleware(
 )
 
 app.include_router(editing.router)
+app.include_router(jobs.router)
+app.include_router(batch.router)
 
 @app.get("/", tags=["Health Check"])
 def read_root():
@@ -0,0 +1,324 @@
+"""
+エントリーシート・履歴書チェック (一括処理版)
+JSONLファイルの文章をまとめて添削し、結果をJSONLファイルに書き出す
+
+入力: 1行1件 {"id": "任意のID", "text_to_check": "添削する文章"}
+出力: 1行1件 {"line": 入力の行番号, "id": ..., "result": ..., "model": ...}
+      失敗した場合は "result" の代わりに "error" を出力する
+      JSONの形式誤りなど再実行しても成功しない行は "permanent": true をつけ、再実行時もスキップする
+      それ以外の失敗（モデルの応答エラーなど）は再実行時に再処理する
+      （同じ行の記録が複数ある場合は、最後の記録が有効）
+
+CLI: python batch.py input.jsonl output.jsonl --concurrency 4
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+import editing
+
+router = APIRouter()
+
+# ==================== 一括処理設定 ====================
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "2"))
+# 実行中の全ての一括処理を合わせた、添削の同時実行数の上限
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+# APIから指定できるファイルはこのディレクトリ配下に限定する
+BATCH_DIR = os.getenv("BATCH_DIR", "/app/batch")
+# 進捗を表示する間隔（秒）
+BATCH_REPORT_INTERVAL_SECONDS = float(os.getenv("BATCH_REPORT_INTERVAL_SECONDS", "10"))
+# 完了した一括処理の進捗を保持する件数と期間（秒）
+BATCH_HISTORY_SIZE = int(os.getenv("BATCH_HISTORY_SIZE", "100"))
+BATCH_TTL_SECONDS = int(os.getenv("BATCH_TTL_SECONDS", "86400"))
+
+
+# 全ての一括処理で共有し、複数の一括処理を同時に実行しても上限を超えないようにする
+_correct_slots = threading.BoundedSemaphore(BATCH_MAX_CONCURRENCY)
+
+
+class BatchProgress:
+    """処理件数・スループット・残り時間を集計する"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = "running"
+        self.total = 0
+        self.skipped = 0
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.finished_at = None
+        self.error = None
+
+    def finish(self, status, error=None):
+        with self.lock:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+
+    def record(self, ok):
+        with self.lock:
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            processed = self.done + self.failed
+            remaining = max(self.total - self.skipped - processed, 0)
+            throughput = processed / elapsed if elapsed > 0 else 0.0
+            eta = remaining / throughput if throughput > 0 else None
+            return {
+                "status": self.status,
+                "total": self.total,
+                "skipped": self.skipped,
+                "done": self.done,
+                "failed": self.failed,
+                "remaining": remaining,
+                "throughput_per_min": round(throughput * 60, 2),
+                "eta_seconds": round(eta) if eta is not None else None,
+                "error": self.error,
+            }
+
+
+def completed_lines(output_path):
+    """出力ファイルから処理済みの行番号を取得する（途中で中断した場合の再開用）"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 中断時に書きかけだった行は無視する
+                continue
+            if not isinstance(record, dict) or not isinstance(record.get("line"), int):
+                continue
+            if "result" in record or record.get("permanent"):
+                completed.add(record["line"])
+    return completed
+
+
+def truncate_partial_line(output_path):
+    """中断時に書きかけだった末尾の行（改行で終わっていない部分）を削除する"""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        # 末尾から改行を探す
+        while pos > 0:
+            size = min(4096, pos)
+            f.seek(pos - size)
+            chunk = f.read(size)
+            index = chunk.rfind(b"\n")
+            if index != -1:
+                pos = pos - size + index + 1
+                break
+            pos -= size
+        if pos != end:
+            f.truncate(pos)
+
+
+def count_lines(input_path):
+    with open(input_path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def correct_record(line_no, raw):
+    """1件分を添削して出力レコードを返す"""
+    # 入力の誤りは再実行しても成功しないため、permanent をつける
+    try:
+        record = json.loads(raw)
+    except json.JSONDecodeError as e:
+        return {"line": line_no, "error": f"JSONの形式が不正です: {e}", "permanent": True}
+    if not isinstance(record, dict) or not isinstance(record.get("text_to_check"), str):
+        return {"line": line_no, "error": "text_to_check がありません", "permanent": True}
+
+    try:
+        with _correct_slots:
+            result = editing.correct(record["text_to_check"])
+        return {"line": line_no, "id": record.get("id"), **result}
+    except Exception as e:
+        return {"line": line_no, "id": record.get("id"), "error": str(e)}
+
+
+def format_progress(snapshot):
+    eta = snapshot["eta_seconds"]
+    eta_text = f"{eta // 60}分{eta % 60}秒" if eta is not None else "-"
+    processed = snapshot["skipped"] + snapshot["done"] + snapshot["failed"]
+    return (
+        f"📊 {processed}/{snapshot['total']}件 "
+        f"(成功 {snapshot['done']} / 失敗 {snapshot['failed']} / スキップ {snapshot['skipped']}) "
+        f"{snapshot['throughput_per_min']}件/分 残り約{eta_text}"
+    )
+
+
+def run_batch(input_path, output_path, concurrency=BATCH_CONCURRENCY, progress=None):
+    """JSONLファイルを一括添削する。出力済みの行はスキップして再開する"""
+    if os.path.realpath(input_path) == os.path.realpath(output_path):
+        raise ValueError("入力ファイルと出力ファイルに同じファイルは指定できません")
+    if not 1 <= concurrency <= BATCH_MAX_CONCURRENCY:
+        raise ValueError(f"concurrency は1以上{BATCH_MAX_CONCURRENCY}以下を指定してください")
+    progress = progress or BatchProgress()
+    # 書きかけの行に続けて追記しないよう、先に削除してから再開する
+    truncate_partial_line(output_path)
+    completed = completed_lines(output_path)
+    progress.total = count_lines(input_path)
+
+    write_lock = threading.Lock()
+    # 同時に処理中の件数を制限し、入力ファイルを全件メモリに読み込まないようにする
+    slots = threading.BoundedSemaphore(concurrency * 2)
+    last_report = [time.monotonic()]
+
+    def finish(future):
+        try:
+            record = future.result()
+            with write_lock:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+            progress.record("result" in record)
+        finally:
+            slots.release()
+
+        now = time.monotonic()
+        if now - last_report[0] >= BATCH_REPORT_INTERVAL_SECONDS:
+            last_report[0] = now
+            print(format_progress(progress.snapshot()))
+
+    with open(input_path, encoding="utf-8") as src, \
+            open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        line_no = 0
+        for raw in src:
+            if not raw.strip():
+                continue
+            line_no += 1
+            if line_no in completed:
+                progress.skipped += 1
+                continue
+            slots.acquire()
+            executor.submit(correct_record, line_no, raw).add_done_callback(finish)
+
+    progress.finish("done")
+    print(format_progress(progress.snapshot()))
+    return progress
+
+
+# ==================== APIエンドポイント ====================
+
+class BatchRegistry:
+    """実行中・完了済みの一括処理を保持する（完了済みは件数上限と有効期限つき）"""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.lock = threading.Lock()
+        self.batches = OrderedDict()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+    def _purge(self):
+        """有効期限切れ・件数超過の完了済み処理を削除（ロック取得済みで呼び出す）"""
+        now = time.time()
+        finished = [k for k, v in self.batches.items() if v["progress"].finished_at is not None]
+        for batch_id in finished:
+            if now - self.batches[batch_id]["progress"].finished_at > self.ttl_seconds:
+                del self.batches[batch_id]
+        finished = [k for k in finished if k in self.batches]
+        while len(finished) > self.max_size:
+            del self.batches[finished.pop(0)]
+
+    def add(self, input_path, output_path, progress):
+        """一括処理を登録してIDを返す。同じファイルを使用中の処理がある場合は None"""
+        with self.lock:
+            self._purge()
+            for batch in self.batches.values():
+                if batch["progress"].finished_at is not None:
+                    continue
+                if output_path in (batch["input_path"], batch["output_path"]) or input_path == batch["output_path"]:
+                    return None
+            batch_id = uuid.uuid4().hex
+            self.batches[batch_id] = {"input_path": input_path, "output_path": output_path, "progress": progress}
+            return batch_id
+
+    def get(self, batch_id):
+        with self.lock:
+            self._purge()
+            batch = self.batches.get(batch_id)
+            return batch["progress"] if batch else None
+
+
+batch_registry = BatchRegistry(BATCH_HISTORY_SIZE, BATCH_TTL_SECONDS)
+
+
+def resolve_path(name):
+    """BATCH_DIR 配下のパスに変換する"""
+    base = os.path.realpath(BATCH_DIR)
+    path = os.path.realpath(os.path.join(base, name))
+    if os.path.commonpath([base, path]) != base:
+        raise HTTPException(status_code=400, detail="ファイルの指定が不正です")
+    return path
+
+
+class BatchRequest(BaseModel):
+    input_file: str
+    output_file: str
+    concurrency: int = BATCH_CONCURRENCY
+
+
+@router.post("/check/batch", status_code=202)
+def create_batch(request: BatchRequest):
+    input_path = resolve_path(request.input_file)
+    output_path = resolve_path(request.output_file)
+    if not os.path.exists(input_path):
+        raise HTTPException(status_code=404, detail="入力ファイルが見つかりません")
+    if input_path == output_path:
+        raise HTTPException(status_code=400, detail="入力ファイルと出力ファイルに同じファイルは指定できません")
+    if not 1 <= request.concurrency <= BATCH_MAX_CONCURRENCY:
+        raise HTTPException(status_code=400, detail=f"concurrency は1以上{BATCH_MAX_CONCURRENCY}以下を指定してください")
+
+    progress = BatchProgress()
+    batch_id = batch_registry.add(input_path, output_path, progress)
+    if batch_id is None:
+        raise HTTPException(status_code=409, detail="同じファイルを使用する一括処理が実行中です")
+
+    def work():
+        try:
+            run_batch(input_path, output_path, request.concurrency, progress)
+        except Exception as e:
+            print(f"❌ 一括処理エラー ({batch_id}): {e}")
+            progress.finish("error", str(e))
+
+    threading.Thread(target=work, name=f"check-batch-{batch_id}", daemon=True).start()
+    return {"batch_id": batch_id, "status": progress.status}
+
+
+@router.get("/check/batch/{batch_id}")
+def get_batch(batch_id: str):
+    progress = batch_registry.get(batch_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="一括処理が見つかりません")
+    return {"batch_id": batch_id, **progress.snapshot()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSONLファイルのエントリーシートを一括添削します")
+    parser.add_argument("input", help="入力JSONLファイル")
+    parser.add_argument("output", help="出力JSONLファイル（既存の場合は続きから再開）")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="同時に処理する件数")
+    args = parser.parse_args()
+    try:
+        run_batch(args.input, args.output, args.concurrency)
+    except ValueError as e:
+        parser.error(str(e))
@@ -2,19 +2,41 @@
 エントリーシート・履歴書チェックAPI (ルーター版)
 """
 
+import os
+import re
+import threading
+import time
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import ollama
 
+import precheck
+
 # APIRouterを使用（api.pyから呼び出される）
 router = APIRouter()
 
-class CheckRequest(BaseModel):
-    text_to_check: str
+# ==================== モデルルーティング設定 ====================
+# 長文・複雑な文章は大きいモデル、短文・単純な文章は小さいモデルで処理する
+LARGE_MODEL = os.getenv("EDITING_LARGE_MODEL", "gemma2:9b")
+SMALL_MODEL = os.getenv("EDITING_SMALL_MODEL", "gemma2:2b")
+# length: 文字数のみで判定 / heuristic: 文字数・行数・文の数で判定
+# large / small: 常に指定したモデルを使用
+ROUTING_POLICIES = ("length", "heuristic", "large", "small")
+ROUTING_POLICY = os.getenv("EDITING_ROUTING_POLICY", "heuristic")
+if ROUTING_POLICY not in ROUTING_POLICIES:
+    raise ValueError(f"EDITING_ROUTING_POLICY は {', '.join(ROUTING_POLICIES)} のいずれかを指定してください: {ROUTING_POLICY}")
+ROUTING_CHAR_THRESHOLD = int(os.getenv("EDITING_ROUTING_CHAR_THRESHOLD", "200"))
+ROUTING_LINE_THRESHOLD = int(os.getenv("EDITING_ROUTING_LINE_THRESHOLD", "3"))
+ROUTING_SENTENCE_THRESHOLD = int(os.getenv("EDITING_ROUTING_SENTENCE_THRESHOLD", "6"))
+# 大きいモデルの推定待ち時間（秒）がこの値を超えたら小さいモデルへ切り替える
+LARGE_MODEL_SLO_SECONDS = float(os.getenv("EDITING_LARGE_MODEL_SLO_SECONDS", "30"))
+# 大きいモデルの平均処理時間（秒）の初期値。起動直後の実測値がない間に使用する
+LARGE_MODEL_INITIAL_LATENCY_SECONDS = float(
+    os.getenv("EDITING_LARGE_MODEL_INITIAL_LATENCY_SECONDS", str(LARGE_MODEL_SLO_SECONDS))
+)
 
-@router.post("/check")
-async def check_resume(request: CheckRequest):
-    prompt = """
+SYSTEM_PROMPT = """
 あなたはプロの就活アドバイザーです。
 エントリーシートや履歴書（志望動機、自己PR、学生時代力を入れたこと、長所短所など）を以下の観点でチェックし、訂正してください。
 
@@ -45,15 +67,105 @@ async def check_resume(request: CheckRequest):
 - 説明や表形式は不要です
 - 問題がない場合は元の文章をそのまま出力してください
 """
-    
-    try:
-        response = ollama.chat(
-            model='gemma2:9b',
-            messages=[
-                {'role': 'system', 'content': prompt},
-                {'role': 'user', 'content': request.text_to_check}
-            ]
+
+
+class ModelRouter:
+    """文章の長さ・複雑さと大きいモデルの混雑状況から使用モデルを選択する"""
+
+    # 移動平均の重み
+    LATENCY_ALPHA = 0.3
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.large_in_flight = 0
+        self.large_avg_latency = LARGE_MODEL_INITIAL_LATENCY_SECONDS
+
+    def is_complex(self, text):
+        """長文・複雑な文章かどうかを判定"""
+        length = len(text.strip())
+        if ROUTING_POLICY == "length":
+            return length > ROUTING_CHAR_THRESHOLD
+
+        lines = [line for line in text.splitlines() if line.strip()]
+        sentences = [s for s in re.split(r"[。！？!?]", text) if s.strip()]
+        return (
+            length > ROUTING_CHAR_THRESHOLD
+            or len(lines) >= ROUTING_LINE_THRESHOLD
+            or len(sentences) >= ROUTING_SENTENCE_THRESHOLD
         )
-        return {"result": response['message']['content']}
+
+    def choose(self, text):
+        """使用するモデル名を返す。大きいモデルを選んだ場合は実行中の件数に加える"""
+        if ROUTING_POLICY == "small":
+            return SMALL_MODEL
+        if ROUTING_POLICY != "large" and not self.is_complex(text):
+            return SMALL_MODEL
+
+        # 同時に来たリクエストが同じ推定値で判定しないよう、判定と加算をまとめて行う
+        with self.lock:
+            # 推定待ち時間（実行中のリクエスト数 × 平均処理時間）が長い場合は小さいモデルへフォールバック
+            estimated_wait = self.large_in_flight * self.large_avg_latency
+            if ROUTING_POLICY != "large" and estimated_wait > LARGE_MODEL_SLO_SECONDS:
+                return SMALL_MODEL
+            self.large_in_flight += 1
+            return LARGE_MODEL
+
+    def chat(self, text, issues=()):
+        """モデルを選択して訂正を実行し、(訂正結果, モデル名) を返す"""
+        model = self.choose(text)
+        if model != LARGE_MODEL:
+            return _chat(model, text, issues), model
+
+        started = time.monotonic()
+        try:
+            return _chat(model, text, issues), model
+        finally:
+            elapsed = time.monotonic() - started
+            with self.lock:
+                self.large_in_flight -= 1
+                self.large_avg_latency = (
+                    self.LATENCY_ALPHA * elapsed
+                    + (1 - self.LATENCY_ALPHA) * self.large_avg_latency
+                )
+
+
+def _chat(model, text, issues=()):
+    """Ollamaに訂正を依頼する"""
+    prompt = SYSTEM_PROMPT
+    if issues:
+        # 事前チェックで検出した問題点を伝える
+        prompt += "\n【事前チェックで検出された問題】\n" + "\n".join(f"- {i}" for i in issues) + "\n"
+    response = ollama.chat(
+        model=model,
+        messages=[
+            {'role': 'system', 'content': prompt},
+            {'role': 'user', 'content': text}
+        ]
+    )
+    return response['message']['content']
+
+
+model_router = ModelRouter()
+
+
+def correct(text):
+    """事前チェックとLLMによる訂正を行い、{"result", "model", "fixes", "issues"} を返す"""
+    # 機械的なミスはローカルで修正し、LLMが不要な文章はここで返す
+    checked = precheck.run(text)
+    if not checked.needs_llm:
+        return {"result": checked.text, "model": "precheck", "fixes": checked.fixes, "issues": checked.issues}
+
+    result, model = model_router.chat(checked.text, checked.issues)
+    return {"result": result, "model": model, "fixes": checked.fixes, "issues": checked.issues}
+
+
+class CheckRequest(BaseModel):
+    text_to_check: str
+
+# ollama.chat はブロッキング呼び出しのため、スレッドプールで実行されるよう同期関数にする
+@router.post("/check")
+def check_resume(request: CheckRequest):
+    try:
+        return correct(request.text_to_check)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,238 @@
+"""
+エントリーシート・履歴書チェックAPI (非同期ジョブ版)
+POST /check/jobs でジョブを登録し、GET /check/jobs/{job_id} で結果を取得する
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+import editing
+
+router = APIRouter()
+
+# ==================== ジョブ設定 ====================
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_STORE_SIZE = int(os.getenv("JOB_STORE_SIZE", "1000"))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("JOB_WEBHOOK_TIMEOUT_SECONDS", "5"))
+# 完了通知を送信してよいホスト（カンマ区切り）。未設定の場合は完了通知を受け付けない
+CALLBACK_ALLOWED_HOSTS = {
+    h.strip().lower() for h in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()
+}
+
+# ジョブの状態
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+
+class JobStore:
+    """件数上限と有効期限つきのジョブ保存領域"""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+    def _purge(self):
+        """有効期限切れのジョブを削除（ロック取得済みで呼び出す）"""
+        now = time.time()
+        for job_id in [k for k, v in self.jobs.items() if now - v["updated_at"] > self.ttl_seconds]:
+            del self.jobs[job_id]
+
+    def add(self, text, callback_url):
+        """ジョブを登録してジョブ情報を返す。空きがない場合は None"""
+        with self.lock:
+            self._purge()
+            if len(self.jobs) >= self.max_size:
+                # 完了済みのジョブから古い順に削除する
+                finished = [k for k, v in self.jobs.items() if v["status"] in (DONE, ERROR)]
+                if not finished:
+                    return None
+                del self.jobs[finished[0]]
+
+            now = time.time()
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "status": QUEUED,
+                "text_to_check": text,
+                "callback_url": callback_url,
+                "result": None,
+                "model": None,
+                "fixes": [],
+                "issues": [],
+                "error": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+            self.jobs[job["job_id"]] = job
+            return dict(job)
+
+    def update(self, job_id, **fields):
+        """ジョブ情報を更新して更新後の情報を返す"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields, updated_at=time.time())
+            return dict(job)
+
+    def get(self, job_id):
+        with self.lock:
+            self._purge()
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def remove(self, job_id):
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+
+class JobRunner:
+    """キューに積まれたジョブを登録順に処理するワーカー"""
+
+    def __init__(self, store, workers, queue_size):
+        self.store = store
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.workers = workers
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        """ワーカースレッドを起動（初回のみ）"""
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"check-job-{i}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def submit(self, text, callback_url=None):
+        """ジョブを登録する。混雑している場合は None"""
+        self.start()
+        job = self.store.add(text, callback_url)
+        if job is None:
+            return None
+        try:
+            self.queue.put_nowait(job["job_id"])
+        except queue.Full:
+            self.store.remove(job["job_id"])
+            return None
+        return job
+
+    def _work(self):
+        while True:
+            job_id = self.queue.get()
+            try:
+                self._run(job_id)
+            finally:
+                self.queue.task_done()
+
+    def _run(self, job_id):
+        job = self.store.update(job_id, status=RUNNING)
+        if job is None:
+            # 期限切れで削除済み
+            return
+        try:
+            corrected = editing.correct(job["text_to_check"])
+            job = self.store.update(job_id, status=DONE, **corrected)
+        except Exception as e:
+            print(f"❌ ジョブ実行エラー ({job_id}): {e}")
+            job = self.store.update(job_id, status=ERROR, error=str(e))
+
+        if job and job["callback_url"]:
+            notify(job)
+
+
+def public_view(job):
+    """APIで返すジョブ情報"""
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "result": job["result"],
+        "model": job["model"],
+        "fixes": job["fixes"],
+        "issues": job["issues"],
+        "error": job["error"],
+    }
+
+
+def is_allowed_callback(url):
+    """完了通知先が http/https かつ許可されたホストか"""
+    parsed = urllib.parse.urlparse(url)
+    return (
+        parsed.scheme in ("http", "https")
+        and parsed.hostname is not None
+        and parsed.hostname.lower() in CALLBACK_ALLOWED_HOSTS
+    )
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """リダイレクトで許可外のホストへ送信されないようにする"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_webhook_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def notify(job):
+    """完了通知をWebhookに送信する（失敗してもジョブには影響させない）"""
+    if not is_allowed_callback(job["callback_url"]):
+        print(f"⚠️ Webhook送信先が許可されていません ({job['job_id']})")
+        return
+    body = json.dumps(public_view(job)).encode("utf-8")
+    request = urllib.request.Request(
+        job["callback_url"],
+        data=body,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with _webhook_opener.open(request, timeout=WEBHOOK_TIMEOUT_SECONDS):
+            pass
+    except Exception as e:
+        print(f"⚠️ Webhook送信エラー ({job['job_id']}): {e}")
+
+
+job_store = JobStore(JOB_STORE_SIZE, JOB_TTL_SECONDS)
+job_runner = JobRunner(job_store, JOB_WORKERS, JOB_QUEUE_SIZE)
+
+
+class CheckJobRequest(BaseModel):
+    text_to_check: str
+    callback_url: Optional[str] = None
+
+
+@router.post("/check/jobs", status_code=202)
+def create_check_job(request: CheckJobRequest):
+    if request.callback_url is not None and not is_allowed_callback(request.callback_url):
+        raise HTTPException(status_code=400, detail="callback_url には許可された http/https のURLを指定してください")
+    job = job_runner.submit(request.text_to_check, request.callback_url)
+    if job is None:
+        raise HTTPException(status_code=503, detail="ジョブが混雑しています。しばらくしてから再度お試しください。")
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+
+@router.get("/check/jobs/{job_id}")
+def get_check_job(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="ジョブが見つかりません")
+    return public_view(job)
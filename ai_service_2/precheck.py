@@ -0,0 +1,107 @@
+"""
+ルールベースの事前チェック
+LLMに渡す前に機械的なミスを修正し、LLMが不要な文章はここで返す
+"""
+
+import os
+import re
+import unicodedata
+
+# この文字数未満の文章はLLMに渡さない
+PRECHECK_MIN_CHARS = int(os.getenv("PRECHECK_MIN_CHARS", "15"))
+
+# 全角英数字 → 半角英数字
+_FULLWIDTH_ALNUM = str.maketrans(
+    {chr(c): chr(c - 0xFEE0) for c in range(ord("０"), ord("９") + 1)}
+    | {chr(c): chr(c - 0xFEE0) for c in range(ord("Ａ"), ord("Ｚ") + 1)}
+    | {chr(c): chr(c - 0xFEE0) for c in range(ord("ａ"), ord("ｚ") + 1)}
+)
+# 全角・半角の英数字の検出用
+_FULLWIDTH_ALNUM_CHARS = re.compile(r"[０-９Ａ-Ｚａ-ｚ]")
+_HALFWIDTH_ALNUM_CHARS = re.compile(r"[0-9A-Za-z]")
+# 半角カタカナ（濁点・半濁点を含む連続部分）
+_HALFWIDTH_KANA = re.compile(r"[｡-ﾟ]+")
+# 句読点の重複（「。。」「、、」「、。」など）
+_DOUBLED_PUNCT = re.compile(r"([、。])[、。]+")
+# 半角スペース・タブの連続
+_SPACES = re.compile(r"[ \t]{2,}")
+
+# 文末表現（です・ます調 / だ・である調）
+_SENTENCE_SPLIT = re.compile(r"(?<=[。！？!?])|\n")
+_DESU_MASU = re.compile(r"(です|ます|ました|でした|ません|ましょう|でしょう)[。！？!?」）)]*$")
+_DE_ARU = re.compile(r"(である|であった|であろう|だ|だった|だろう)[。！？!?」）)]*$")
+
+
+class PrecheckResult:
+    """事前チェックの結果"""
+
+    def __init__(self, text, fixes, issues, needs_llm):
+        self.text = text            # 機械的なミスを修正した文章
+        self.fixes = fixes          # ローカルで修正した項目
+        self.issues = issues        # LLMでの修正が必要な項目
+        self.needs_llm = needs_llm  # LLMに渡す必要があるか
+
+
+def normalize(text):
+    """機械的なミスを修正し、(修正後の文章, 修正項目) を返す"""
+    fixes = []
+    # 改行コードの統一は修正項目として扱わない
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    # 全角・半角の英数字が混在している場合のみ半角に統一する（全角で統一された文章はそのまま）
+    fixed = text
+    if _FULLWIDTH_ALNUM_CHARS.search(text) and _HALFWIDTH_ALNUM_CHARS.search(text):
+        fixed = text.translate(_FULLWIDTH_ALNUM)
+        fixes.append("全角英数字を半角に統一")
+
+    kana = _HALFWIDTH_KANA.sub(lambda m: unicodedata.normalize("NFKC", m.group()), fixed)
+    if kana != fixed:
+        fixes.append("半角カタカナを全角に統一")
+    fixed = kana
+
+    punct = _DOUBLED_PUNCT.sub(lambda m: m.group()[-1], fixed)
+    if punct != fixed:
+        fixes.append("句読点の重複を削除")
+    fixed = punct
+
+    # 段落の字下げ（全角スペース）は残し、前後の空行と行末の半角スペースのみ削除する
+    lines = [_SPACES.sub(" ", line).rstrip(" \t") for line in fixed.split("\n")]
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    spaced = "\n".join(lines)
+    if spaced != fixed:
+        fixes.append("余分な空白を削除")
+    fixed = spaced
+
+    return fixed, fixes
+
+
+def detect_mixed_style(text):
+    """です・ます調とだ・である調が混在しているか"""
+    polite = plain = 0
+    for sentence in _SENTENCE_SPLIT.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if _DESU_MASU.search(sentence):
+            polite += 1
+        elif _DE_ARU.search(sentence):
+            plain += 1
+    return polite > 0 and plain > 0
+
+
+def run(text):
+    """事前チェックを実行する"""
+    normalized, fixes = normalize(text)
+
+    issues = []
+    if detect_mixed_style(normalized):
+        issues.append("です・ます調とだ・である調の混在")
+
+    # 空・短すぎる文章はLLMに渡さず、機械的な修正のみで返す
+    if len(normalized) < PRECHECK_MIN_CHARS:
+        return PrecheckResult(normalized, fixes, issues, needs_llm=False)
+
+    return PrecheckResult(normalized, fixes, issues, needs_llm=True)
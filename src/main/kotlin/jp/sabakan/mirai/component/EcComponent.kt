@@ -1,12 +1,17 @@
 package jp.sabakan.mirai.component
 
+import com.fasterxml.jackson.annotation.JsonProperty
 import org.springframework.beans.factory.annotation.Value
 import org.springframework.stereotype.Component
 import org.springframework.web.client.RestTemplate
 
-// 1. JSONを受け取るための入れ物（データクラス）を定義
-data class EcApiResponse(
-    val result: String = ""
+// 添削ジョブの状態を受け取るデータクラス
+data class EcJobResponse(
+    @JsonProperty("job_id")
+    val jobId: String = "",
+    val status: String = "",
+    val result: String? = null,
+    val error: String? = null
 )
 
 @Component
@@ -15,17 +20,32 @@ class EcComponent(
     @Value("\${ec.api.url:http://ai-2:8002}")
     private val baseUrl: String
 ) {
-    fun analyzeMessage(message: String): String? {
-        val url = "$baseUrl/check"
+    /**
+     * 添削ジョブを登録する
+     * 結果は画面側から getJob で確認する
+     *
+     * @param message 添削する文章
+     * @return ジョブID（登録できなかった場合は null）
+     */
+    fun submitJob(message: String): String? {
         val requestBody = mapOf("text_to_check" to message)
 
         return try {
-            // 受け取る型を指定
-            val response = restTemplate.postForObject(url, requestBody, EcApiResponse::class.java)
-            // 文章のみの出力になるようにする
-            response?.result?.trim()
+            restTemplate.postForObject("$baseUrl/check/jobs", requestBody, EcJobResponse::class.java)?.jobId
         } catch (e: Exception) {
-            "通信エラー: ${e.message}"
+            null
         }
     }
-}
\ No newline at end of file
+
+    /**
+     * 添削ジョブの状態を取得する
+     *
+     * @param jobId ジョブID
+     * @return ジョブの状態
+     */
+    fun getJob(jobId: String): EcJobResponse? {
+        val response = restTemplate.getForObject("$baseUrl/check/jobs/{jobId}", EcJobResponse::class.java, jobId)
+        // 文章のみの出力になるようにする
+        return response?.copy(result = response.result?.trim())
+    }
+}
@@ -3,14 +3,20 @@ package jp.sabakan.mirai.controller
 import jp.sabakan.mirai.request.EsRequest
 import jp.sabakan.mirai.service.EsService
 import jp.sabakan.mirai.component.EcComponent
+import jp.sabakan.mirai.component.EcJobResponse
 import jp.sabakan.mirai.security.LoginUserDetails
 import org.springframework.beans.factory.annotation.Autowired
+import org.springframework.http.HttpStatus
+import org.springframework.http.ResponseEntity
 import org.springframework.security.core.annotation.AuthenticationPrincipal
 import org.springframework.stereotype.Controller
 import org.springframework.ui.Model
 import org.springframework.web.bind.annotation.GetMapping
+import org.springframework.web.bind.annotation.PathVariable
 import org.springframework.web.bind.annotation.PostMapping
 import org.springframework.web.bind.annotation.RequestParam
+import org.springframework.web.bind.annotation.ResponseBody
+import org.springframework.web.client.HttpClientErrorException
 import org.springframework.validation.BindingResult
 import jakarta.validation.Valid
 import jp.sabakan.mirai.MessageConfig
@@ -88,10 +94,10 @@ class EsController {
         }
 
         when (action) {
-            "checkReason" -> model.addAttribute("reasonResult", ecComponent.analyzeMessage(esRequest.esContentReason ?: ""))
-            "checkSelfpr" -> model.addAttribute("selfprResult", ecComponent.analyzeMessage(esRequest.esContentSelfpr ?: ""))
-            "checkActivities" -> model.addAttribute("activitiesResult", ecComponent.analyzeMessage(esRequest.esContentActivities ?: ""))
-            "checkStwe" -> model.addAttribute("stweResult", ecComponent.analyzeMessage(esRequest.esContentStwe ?: ""))
+            "checkReason" -> startCheck(model, "reasonResult", esRequest.esContentReason)
+            "checkSelfpr" -> startCheck(model, "selfprResult", esRequest.esContentSelfpr)
+            "checkActivities" -> startCheck(model, "activitiesResult", esRequest.esContentActivities)
+            "checkStwe" -> startCheck(model, "stweResult", esRequest.esContentStwe)
             "save" -> {
                 val response = esService.saveEs(esRequest)
                 redirectAttributes.addFlashAttribute("message", response.message)
@@ -157,10 +163,10 @@ class EsController {
         }
 
         when (action) {
-            "checkReason" -> model.addAttribute("reasonResult", ecComponent.analyzeMessage(esRequest.esContentReason ?: ""))
-            "checkSelfpr" -> model.addAttribute("selfprResult", ecComponent.analyzeMessage(esRequest.esContentSelfpr ?: ""))
-            "checkActivities" -> model.addAttribute("activitiesResult", ecComponent.analyzeMessage(esRequest.esContentActivities ?: ""))
-            "checkStwe" -> model.addAttribute("stweResult", ecComponent.analyzeMessage(esRequest.esContentStwe ?: ""))
+            "checkReason" -> startCheck(model, "reasonResult", esRequest.esContentReason)
+            "checkSelfpr" -> startCheck(model, "selfprResult", esRequest.esContentSelfpr)
+            "checkActivities" -> startCheck(model, "activitiesResult", esRequest.esContentActivities)
+            "checkStwe" -> startCheck(model, "stweResult", esRequest.esContentStwe)
             "save" -> {
                 val response = esService.saveEs(esRequest)
                 redirectAttributes.addFlashAttribute("message", response.message)
@@ -177,4 +183,32 @@ class EsController {
         model.addAttribute("esRequest", esRequest)
         return "entrysheet/es-edit"
     }
-}
\ No newline at end of file
+
+    // 添削ジョブの状態 (画面からの確認用)
+    @GetMapping("/es/check/jobs/{jobId}")
+    @ResponseBody
+    fun getCheckJob(@PathVariable jobId: String): ResponseEntity<EcJobResponse> {
+        return try {
+            val job = ecComponent.getJob(jobId) ?: EcJobResponse(jobId = jobId)
+            ResponseEntity.ok(job)
+        } catch (e: HttpClientErrorException.NotFound) {
+            ResponseEntity.status(HttpStatus.NOT_FOUND).body(
+                EcJobResponse(jobId = jobId, status = "error", error = "ジョブが見つかりません")
+            )
+        } catch (e: Exception) {
+            // 一時的な通信エラーのため、画面側で再確認する
+            ResponseEntity.status(HttpStatus.SERVICE_UNAVAILABLE).body(EcJobResponse(jobId = jobId))
+        }
+    }
+
+    // 添削ジョブを登録し、画面で結果を確認できるようにする
+    private fun startCheck(model: Model, target: String, text: String?) {
+        val jobId = ecComponent.submitJob(text ?: "")
+        if (jobId == null) {
+            model.addAttribute(target, "通信エラー: 添削を開始できませんでした")
+            return
+        }
+        model.addAttribute("checkJobId", jobId)
+        model.addAttribute("checkTarget", target)
+    }
+}
@@ -0,0 +1,69 @@
+// ========================================
+// ES添削ジョブの結果確認
+// ========================================
+
+const CHECK_POLL_INTERVAL = 1000;  // 1秒
+const CHECK_TIMEOUT = 180000;      // 3分
+
+document.addEventListener("DOMContentLoaded", function () {
+    const checkJob = document.getElementById("check-job");
+    if (!checkJob) {
+        return;
+    }
+
+    const jobId = checkJob.dataset.jobId;
+    const target = checkJob.dataset.target;
+    const resultText = document.getElementById(`${target}-text`);
+    const resultValue = document.getElementById(`${target}-value`);
+    const buttons = document.querySelectorAll("form.menu button");
+    const deadline = Date.now() + CHECK_TIMEOUT;
+
+    /**
+     * 添削中はボタンを無効化する
+     */
+    function setButtonsDisabled(disabled) {
+        buttons.forEach(btn => {
+            btn.disabled = disabled;
+            btn.style.opacity = disabled ? "0.5" : "";
+        });
+    }
+
+    /**
+     * 結果を画面に反映して確認を終了する
+     */
+    function finish(text) {
+        resultText.textContent = text;
+        resultValue.value = text;
+        setButtonsDisabled(false);
+    }
+
+    async function poll() {
+        if (Date.now() > deadline) {
+            finish("通信エラー: タイムアウトしました");
+            return;
+        }
+
+        try {
+            const response = await fetch(`/es/check/jobs/${encodeURIComponent(jobId)}`);
+            const job = await response.json();
+
+            if (job.status === "done") {
+                finish(job.result ?? "");
+                return;
+            }
+            if (job.status === "error") {
+                finish(`通信エラー: ${job.error}`);
+                return;
+            }
+        } catch (e) {
+            // 一時的な通信エラーは、期限まで再確認する
+            console.warn("添削結果の確認に失敗しました", e);
+        }
+
+        setTimeout(poll, CHECK_POLL_INTERVAL);
+    }
+
+    resultText.textContent = "添削中...";
+    setButtonsDisabled(true);
+    poll();
+});